@@ -49,32 +49,46 @@ def graphrag_app(initialized: bool):
         COLUMN_WIDTHS = [0.275, 0.45, 0.275]
         api_url = st.session_state[EnvVars.DEPLOYMENT_URL.value]
         apim_key = st.session_state[EnvVars.APIM_SUBSCRIPTION_KEY.value]
-        client = GraphragAPI(api_url, apim_key)
-        indexPipe = IndexPipeline(client, COLUMN_WIDTHS)
+        # keep the API client (and its connection pool) for the whole session
+        if st.session_state.get("client_config") != (api_url, apim_key):
+            st.session_state["client"] = GraphragAPI(api_url, apim_key)
+            st.session_state["indexPipe"] = IndexPipeline(
+                st.session_state["client"], COLUMN_WIDTHS
+            )
+            st.session_state["client_config"] = (api_url, apim_key)
+        client = st.session_state["client"]
+        indexPipe = st.session_state["indexPipe"]
 
         # display tabs
+        perms = st.session_state["perms_set"]
+        # request the API lists the visible tabs need at the same time
+        tabs.prefetch_api_lists(
+            client,
+            containers="AllowCreateIndex" in perms,
+            indexes="AllowQuery" in perms,
+        )
         with prompt_gen_tab:
-            if "AllowCreateIndex" in st.session_state["permissions"]:
+            if "AllowCreateIndex" in perms:
                 tabs.get_prompt_generation_tab(client, COLUMN_WIDTHS)
             else:
                 st.info("You do not have permission to access this tab.")
         with prompt_edit_tab:
-            if "AllowCreateIndex" in st.session_state["permissions"]:
+            if "AllowCreateIndex" in perms:
                 tabs.get_prompt_configuration_tab()
             else:
                 st.info("You do not have permission to access this tab.")
         with index_tab:
-            if "AllowCreateIndex" in st.session_state["permissions"]:
+            if "AllowCreateIndex" in perms:
                 tabs.get_index_tab(indexPipe)
             else:
                 st.info("You do not have permission to access this tab.")
         with query_tab:
-            if "AllowQuery" in st.session_state["permissions"]:
+            if "AllowQuery" in perms:
                 tabs.get_query_tab(client, st.session_state["graphragindexes"])
             else:
                 st.info("You do not have permission to access this tab.")
         with query_history_tab:
-            if "AllowQuery" in st.session_state["permissions"]:
+            if "AllowQuery" in perms:
                 tabs.get_query_history_tab()
             else:
                 st.info("You do not have permission to access this tab.")
@@ -3,70 +3,177 @@
 
 import json
 import re
-
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import requests
+from azure.core.credentials import TokenCredential
+from azure.core.pipeline.transport import RequestsTransport
 from azure.cosmos import (
     ContainerProxy,
     CosmosClient,
     DatabaseProxy,
 )
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
-from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
+from azure.identity import (
+    ChainedTokenCredential,
+    DefaultAzureCredential,
+    ManagedIdentityCredential,
+)
+from azure.storage.blob import BlobClient, BlobServiceClient, ContainerClient
 from environs import Env
+from requests.adapters import HTTPAdapter
 
 from .models import User
 
 # Error messages
 ENDPOINT_ERROR_MSG = "Could not find COSMOS_URI_ENDPOINT in environment variables"
 ENDPOINT_ERROR_MSG_AZUREBLOB = (
-    "Could not find AZUREBLOB_URI_ENDPOINT in environment variables"
+    "Could not find STORAGE_ACCOUNT_BLOB_URL in environment variables"
 )
+DATABASE_ERROR_MSG = "Could not find COSMOS_DB_NAME in environment variables"
+
+# Blob container holding the per-session query histories
+QUERY_HISTORY_CONTAINER = "query-history"
+
+# Page size for cross-partition Cosmos DB queries
+QUERY_PAGE_SIZE = 1000
+
+# Seconds the user and index lists are served from memory before refreshing
+LIST_CACHE_TTL = 60
+
+# Seconds a user record read by get_user is reused, and how many are kept
+USER_CACHE_TTL = 5
+USER_CACHE_MAXSIZE = 1024
+
+# Number of parallel connections used to transfer a single large blob
+BLOB_MAX_CONCURRENCY = 8
+
+# Blob transfer sizes: blobs above 8 MiB are moved as 8 MiB blocks/ranges
+BLOB_TRANSFER_SIZE = 8 * 1024 * 1024
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+_env = Env()
+_STORAGE_URL = _env.str("STORAGE_ACCOUNT_BLOB_URL", None)
+_COSMOS_URL = _env.str("COSMOS_URI_ENDPOINT", None)
+_COSMOS_DB = _env.str("COSMOS_DB_NAME", None)
+
+
+def _require(value: str | None, error_msg: str) -> str:
+    """
+    Returns a required setting read from the environment at import.
+
+    Raises:
+        ValueError: If the setting is not set, so a missing endpoint fails fast
+            instead of being used as the endpoint itself.
+    """
+    if not value:
+        raise ValueError(error_msg)
+    return value
+
+
+@lru_cache
+def get_credential() -> TokenCredential:
+    """
+    Returns the credential shared by the Azure clients.
+
+    A single instance is created per process so its token cache serves both the
+    blob and Cosmos DB clients.
+
+    AZURE_CREDENTIAL_KIND selects the credential: "managed" (default) tries the
+    deployment's managed identity (AZURE_CLIENT_ID, if set) first and only falls
+    back to DefaultAzureCredential when that fails; "default" uses
+    DefaultAzureCredential directly, which is what local development needs.
+
+    The fallback skips the managed identity probe, which has just failed, and the
+    desktop-only sources that cannot succeed in a container.
+    """
+    if _env.str("AZURE_CREDENTIAL_KIND", "managed") == "managed":
+        return ChainedTokenCredential(
+            ManagedIdentityCredential(client_id=_env.str("AZURE_CLIENT_ID", None)),
+            DefaultAzureCredential(
+                exclude_managed_identity_credential=True,
+                exclude_shared_token_cache_credential=True,
+                exclude_visual_studio_code_credential=True,
+                exclude_powershell_credential=True,
+                exclude_interactive_browser_credential=True,
+            ),
+        )
+    return DefaultAzureCredential()
+
+
+def get_transport() -> RequestsTransport:
+    """
+    Returns an HTTP transport with a connection pool sized for concurrent sessions.
+
+    The pool size is read from AZURE_POOL_SIZE (default 16). Connections are kept
+    alive and reused, so calls do not pay a new TCP and TLS handshake each time.
+    """
+    pool_size = _env.int("AZURE_POOL_SIZE", 16)
+    session = requests.Session()
+    session.mount(
+        "https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    )
+    return RequestsTransport(session=session, connection_timeout=10, read_timeout=60)
+
+
 class BlobServiceClientSingleton:
     _instance = None
-    _env = Env()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            account_url = cls._env.str(
-                "STORAGE_ACCOUNT_BLOB_URL", ENDPOINT_ERROR_MSG_AZUREBLOB
+            account_url = _require(_STORAGE_URL, ENDPOINT_ERROR_MSG_AZUREBLOB)
+            credential = get_credential()
+            cls._instance = BlobServiceClient(
+                account_url,
+                credential=credential,
+                transport=get_transport(),
+                max_single_get_size=BLOB_TRANSFER_SIZE,
+                max_chunk_get_size=BLOB_TRANSFER_SIZE,
+                max_single_put_size=BLOB_TRANSFER_SIZE,
+                max_block_size=BLOB_TRANSFER_SIZE,
             )
-            credential = DefaultAzureCredential()
-            cls._instance = BlobServiceClient(account_url, credential=credential)
         return cls._instance
 
     @classmethod
     def get_storage_account_name(cls):
-        account_url = cls._env.str(
-            "STORAGE_ACCOUNT_BLOB_URL", ENDPOINT_ERROR_MSG_AZUREBLOB
-        )
+        account_url = _require(_STORAGE_URL, ENDPOINT_ERROR_MSG_AZUREBLOB)
         return account_url.split("//")[1].split(".")[0]
 
 
 class CosmosClientSingleton:
     _instance = None
-    _env = Env()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            endpoint = cls._env.str("COSMOS_URI_ENDPOINT", ENDPOINT_ERROR_MSG)
-            credential = DefaultAzureCredential()
-            cls._instance = CosmosClient(endpoint, credential)
+            endpoint = _require(_COSMOS_URL, ENDPOINT_ERROR_MSG)
+            credential = get_credential()
+            cls._instance = CosmosClient(
+                endpoint,
+                credential,
+                transport=get_transport(),
+                connection_verify=True,
+                connection_timeout=5,
+                retry_total=3,
+            )
         return cls._instance
 
 
+@lru_cache
 def get_database_client(database_name: str) -> DatabaseProxy:
     client = CosmosClientSingleton.get_instance()
     return client.get_database_client(database_name)
 
 
+@lru_cache
 def get_database_container_client(
     database_name: str, container_name: str
 ) -> ContainerProxy:
@@ -74,169 +181,285 @@ def get_database_container_client(
     return db_client.get_container_client(container_name)
 
 
-class AzureStorageClientManager:
+@lru_cache
+def get_blob_container_client(container_name: str) -> ContainerClient:
+    blob_service_client = BlobServiceClientSingleton.get_instance()
+    return blob_service_client.get_container_client(container_name)
+
+
+@lru_cache(maxsize=1024)
+def _get_query_history_blob_client(blob_name: str) -> BlobClient:
+    container_client = get_blob_container_client(QUERY_HISTORY_CONTAINER)
+    return container_client.get_blob_client(blob_name)
+
+
+@lru_cache
+def get_user_container() -> ContainerProxy:
     """
-    Manages the Azure storage clients for blob storage and Cosmos DB.
-
-    Attributes:
-        azure_storage_blob_url (str): The blob endpoint for azure storage.
-        cosmos_uri_endpoint (str): The uri endpoint for the Cosmos DB.
-        _blob_service_client (BlobServiceClient): The blob service client.
-        _cosmos_client (CosmosClient): The Cosmos DB client.
-        _cosmos_database_client (DatabaseProxy): The Cosmos DB database client.
-        _cosmos_container_client (ContainerProxy): The Cosmos DB container client.
+    Returns the container holding the user accounts, created on first use.
     """
+    return get_database_container_client(
+        _require(_COSMOS_DB, DATABASE_ERROR_MSG),
+        "user-accounts",
+    )
 
-    def __init__(self) -> None:
-        self._env = Env()
-        self.azure_storage_blob_url = self._env.str(
-            "STORAGE_ACCOUNT_BLOB_URL", ENDPOINT_ERROR_MSG_AZUREBLOB
-        )
-        self.cosmos_uri_endpoint = self._env.str(
-            "COSMOS_URI_ENDPOINT", ENDPOINT_ERROR_MSG
-        )
-        credential = DefaultAzureCredential()
-        self._blob_service_client = BlobServiceClient(
-            account_url=self.azure_storage_blob_url, credential=credential
-        )
-        self._cosmos_client = CosmosClient(
-            url=self.cosmos_uri_endpoint, credential=credential
-        )
 
-    def get_blob_service_client(self) -> BlobServiceClient:
-        """
-        Returns the blob service client.
-
-        Returns:
-            BlobServiceClient: The blob service client.
-        """
-        return self._blob_service_client
-
-    def get_cosmos_client(self) -> CosmosClient:
-        """
-        Returns the Cosmos DB client.
-
-        Returns:
-            CosmosClient: The Cosmos DB client.
-        """
-        return self._cosmos_client
-
-    def get_cosmos_database_client(self, database_name: str) -> DatabaseProxy:
-        """
-        Returns the Cosmos DB database client.
-
-        Args:
-            database_name (str): The name of the database.
-
-        Returns:
-            DatabaseProxy: The Cosmos DB database client.
-        """
-        if not hasattr(self, "_cosmos_database_client"):
-            self._cosmos_database_client = self._cosmos_client.get_database_client(
-                database=database_name
-            )
-        return self._cosmos_database_client
-
-    def get_cosmos_container_client(
-        self, database_name: str, container_name: str
-    ) -> ContainerProxy:
-        """
-        Returns the Cosmos DB container client.
-
-        Args:
-            database_name (str): The name of the database.
-            container_name (str): The name of the container.
-
-        Returns:
-            ContainerProxy: The Cosmos DB container client.
-        """
-        if not hasattr(self, "_cosmos_container_client"):
-            self._cosmos_container_client = self.get_cosmos_database_client(
-                database_name=database_name
-            ).get_container_client(container=container_name)
-        return self._cosmos_container_client
-
-
-user_container = AzureStorageClientManager().get_cosmos_container_client(
-    Env().str(
-        "COSMOS_DB_NAME", "Could not find COSMOS_DB_NAME in environment variables"
-    ),
-    "user-accounts",
-)
+@lru_cache
+def get_graphrag_container_store() -> ContainerProxy:
+    """
+    Returns the container store listing the graphrag indexes, created on first use.
+    """
+    return get_database_container_client(
+        _require(_COSMOS_DB, DATABASE_ERROR_MSG),
+        "container-store",
+    )
 
-graphrag_container_store = AzureStorageClientManager().get_cosmos_container_client(
-    Env().str(
-        "COSMOS_DB_NAME", "Could not find COSMOS_DB_NAME in environment variables"
-    ),
-    "container-store",
-)
 
+def point_read(container: ContainerProxy, id_: str, pk: str) -> dict | None:
+    """
+    Reads a single item by id and partition key.
+
+    Lookups that know both the id and the partition key must use this (a
+    point read) rather than a "SELECT ... WHERE c.id = @id" query, which costs
+    several times more RUs for the same item.
 
-def get_user(username: str) -> User:
+    Args:
+        container (ContainerProxy): The container holding the item.
+        id_ (str): The id of the item.
+        pk (str): The partition key value of the item.
+
+    Returns:
+        dict | None: The item, or None if it does not exist.
+    """
     try:
-        user_item = user_container.read_item(item=username, partition_key=username)
-        return User(**user_item)
+        return container.read_item(item=id_, partition_key=pk)
     except CosmosResourceNotFoundError:
         return None
 
 
+# username -> (expiry, user document) for recent get_user reads
+_user_items: OrderedDict = OrderedDict()
+_user_items_lock = threading.Lock()
+
+
+def _forget_user(username: str) -> None:
+    with _user_items_lock:
+        _user_items.pop(username, None)
+
+
+def get_user(username: str, fresh: bool = False) -> User:
+    """
+    Returns the user account, or None if it does not exist.
+
+    The document is reused for USER_CACHE_TTL seconds, so the several lookups made
+    while handling one login or admin action cost a single point read; writes
+    through this module drop it. Pass fresh=True to always read the account, e.g.
+    before acting on a field another process may have just changed. Every call
+    still returns a new User.
+
+    The returned User is per-user data: keep it in st.session_state, never in a
+    module-level variable or st.cache_resource, which are shared by all sessions.
+    """
+    now = time.monotonic()
+    with _user_items_lock:
+        cached = _user_items.get(username)
+    if not fresh and cached is not None and cached[0] > now:
+        user_item = cached[1]
+    else:
+        user_item = point_read(get_user_container(), username, username)
+        if user_item is None:
+            return None
+        with _user_items_lock:
+            _user_items[username] = (now + USER_CACHE_TTL, user_item)
+            _user_items.move_to_end(username)
+            while len(_user_items) > USER_CACHE_MAXSIZE:
+                _user_items.popitem(last=False)
+    return User(**user_item)
+
+
+class _StaleWhileRevalidateCache:
+    """
+    Caches the list returned by a loader for `ttl` seconds.
+
+    Once the entry has expired the stale list is still returned immediately while
+    a background thread reloads it; only the very first call (or the first call
+    after invalidate()) waits for the loader.
+    """
+
+    def __init__(self, loader, ttl: float) -> None:
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires_at = 0.0
+        self._refreshing = False
+        self._generation = 0
+
+    def get(self) -> list:
+        with self._lock:
+            value = self._value
+            if (
+                value is not None
+                and time.monotonic() >= self._expires_at
+                and not self._refreshing
+            ):
+                self._refreshing = True
+                threading.Thread(target=self._refresh, daemon=True).start()
+        if value is None:
+            value = self._refresh()
+        # hand out copies so callers cannot mutate the cached list
+        return list(value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+    def _refresh(self) -> list:
+        generation = self._generation
+        try:
+            value = list(self._loader())
+        finally:
+            with self._lock:
+                self._refreshing = False
+        with self._lock:
+            # drop the result if the cache was invalidated while loading
+            if generation == self._generation:
+                self._value = value
+                self._expires_at = time.monotonic() + self._ttl
+        return value
+
+
+def _query_users():
+    query = (
+        "SELECT c.id, c.username, c.salt, c.hashpassword, c.permissions,"
+        " c.graphragindexes, c.accountstatus FROM c"
+    )
+    pages = (
+        get_user_container()
+        .query_items(
+            query=query,
+            enable_cross_partition_query=True,
+            populate_query_metrics=False,
+            max_item_count=QUERY_PAGE_SIZE,
+        )
+        .by_page()
+    )
+    for page in pages:
+        yield from page
+
+
+def _query_graphrag_indexes():
+    query = "SELECT VALUE c.human_readable_name FROM c WHERE c.type = 'index'"
+    return get_graphrag_container_store().query_items(
+        query=query,
+        enable_cross_partition_query=True,
+        populate_query_metrics=False,
+        max_item_count=QUERY_PAGE_SIZE,
+    )
+
+
+_users_cache = _StaleWhileRevalidateCache(_query_users, LIST_CACHE_TTL)
+_graphrag_indexes_cache = _StaleWhileRevalidateCache(
+    _query_graphrag_indexes, LIST_CACHE_TTL
+)
+
+
 def save_user(user: User):
-    user_container.upsert_item(user.model_dump())
+    get_user_container().upsert_item(user.model_dump())
+    _forget_user(user.username)
+    _users_cache.invalidate()
 
 
 def list_users():
-    query = "SELECT * FROM c"
-    users = list(
-        user_container.query_items(query=query, enable_cross_partition_query=True)
-    )
-    return users
+    """
+    Returns the user accounts, projected to the fields of User so a record can be
+    turned into a User without reading the account again.
+
+    The list is served from memory for LIST_CACHE_TTL seconds and refreshed in the
+    background after that; writes through this module invalidate it.
+    """
+    return _users_cache.get()
 
 
 def delete_user(username: str) -> bool:
     try:
-        user_container.delete_item(item=username, partition_key=username)
+        get_user_container().delete_item(item=username, partition_key=username)
         return True
     except CosmosResourceNotFoundError:
         return False
+    finally:
+        _forget_user(username)
+        _users_cache.invalidate()
 
 
-def deactivate_user(username: str) -> bool:
-    user = get_user(username)
-    if user:
-        user.accountstatus = "Inactive"
-        save_user(user)
+def _patch_user(username: str, fields: dict) -> bool:
+    # partial update of the given fields only; avoids a read plus a full-document
+    # upsert, and leaves fields changed elsewhere since the caller's read alone
+    try:
+        get_user_container().patch_item(
+            item=username,
+            partition_key=username,
+            patch_operations=[
+                {"op": "set", "path": f"/{field}", "value": value}
+                for field, value in fields.items()
+            ],
+        )
         return True
-    return False
+    except CosmosResourceNotFoundError:
+        return False
+    finally:
+        _forget_user(username)
+        _users_cache.invalidate()
+
+
+def _set_account_status(username: str, accountstatus: str) -> bool:
+    return _patch_user(username, {"accountstatus": accountstatus})
+
+
+def set_user_access(username: str, permissions: list, graphragindexes: list) -> bool:
+    return _patch_user(
+        username, {"permissions": permissions, "graphragindexes": graphragindexes}
+    )
+
+
+def set_user_password(username: str, salt: int, hashpassword: str) -> bool:
+    return _patch_user(username, {"salt": salt, "hashpassword": hashpassword})
+
+
+def deactivate_user(username: str) -> bool:
+    return _set_account_status(username, "Inactive")
 
 
 def activate_user(username: str) -> bool:
-    user = get_user(username)
-    if user:
-        user.accountstatus = "Active"
-        save_user(user)
-        return True
-    return False
+    return _set_account_status(username, "Active")
 
 
 def list_graphrag_indexes():
     """
     Returns the list of available "graphRag indexes" for assigning to the users
+
+    The index catalog is shared by all users and changes rarely, so it is served
+    from memory for LIST_CACHE_TTL seconds and refreshed in the background.
     """
-    query = "SELECT c.human_readable_name FROM c WHERE c.type = 'index'"
-    items = list(
-        graphrag_container_store.query_items(
-            query=query, enable_cross_partition_query=True
-        )
-    )
-    return [item["human_readable_name"] for item in items]
+    return _graphrag_indexes_cache.get()
+
+
+def _dumps(obj) -> bytes:
+    """
+    Serializes obj to compact JSON bytes, ready to upload as a blob.
+    """
+    return json.dumps(obj, separators=(",", ":")).encode()
 
 
-def truncateText(inputText: str, length: int = 200):
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def truncateText(inputText: str, length: int = 200) -> str:
     # truncate the string to the maxlength
-    if str and length > 50 and len(inputText) > length:
+    if inputText and length > 50 and len(inputText) > length:
         return f"{inputText[:length]}..."
-    else:
-        return inputText
+    return inputText
 
 
 def sanitize_metadata_value(value: str) -> str:
@@ -253,10 +476,11 @@ def sanitize_metadata_value(value: str) -> str:
     sanitized_value = value.strip()
 
     # Replace newline characters with spaces
-    sanitized_value = re.sub(r"\s+", " ", sanitized_value)
+    sanitized_value = _WHITESPACE_RE.sub(" ", sanitized_value)
 
     # Remove non-ASCII characters (metadata only accepts ascii characters)
-    sanitized_value = sanitized_value.encode("ascii", "ignore").decode()
+    if not sanitized_value.isascii():
+        sanitized_value = sanitized_value.encode("ascii", "ignore").decode()
 
     # Truncate the value if it's too long for metadata
     max_length = (
@@ -268,6 +492,16 @@ def sanitize_metadata_value(value: str) -> str:
     return sanitized_value
 
 
+# Metadata keys written by save_query_histories, in display order
+QUERY_HISTORY_META_KEYS = (
+    "lastquerytime",
+    "lastquerycontent",
+    "lastqueryindexes",
+    "lastqueryType",
+    "lastanswercontent",
+)
+
+
 def save_query_histories(
     blob_name: str,
     query_histories: list,
@@ -289,10 +523,7 @@ def save_query_histories(
         lastanswercontent (str): The content of the last answer.
     """
 
-    blob_service_client = BlobServiceClientSingleton.get_instance()
-    blob_client = blob_service_client.get_blob_client(
-        container="query-history", blob=blob_name
-    )
+    blob_client = _get_query_history_blob_client(blob_name)
 
     # Save the last query and answer
     metadata = {
@@ -304,11 +535,18 @@ def save_query_histories(
     }
 
     blob_client.upload_blob(
-        json.dumps(query_histories), overwrite=True, metadata=metadata
+        _dumps(query_histories),
+        overwrite=True,
+        metadata=metadata,
+        max_concurrency=BLOB_MAX_CONCURRENCY,
     )
 
 
 # # Function to handle large data saving
+# # Kept as a sketch: nothing calls it, and load_query_histories would also need
+# # to reassemble the chunks. Each item is serialized once and chunks are built
+# # by walking the list with an index, so splitting is linear in the items; an
+# # item larger than max_blob_size gets a chunk of its own.
 # def save_large_query_histories(
 #     blob_client: BlobClient, query_histories: list, max_blob_size=4 * 1024 * 1024
 # ):
@@ -320,22 +558,31 @@ def save_query_histories(
 #         query_histories (list): The query histories data to be saved.
 #         max_blob_size (int): The maximum size of each blob in bytes.
 #     """
-#     chunk_index = 0
-#     while query_histories:
-#         chunk = []
-#         current_size = 0
-#         while (
-#             query_histories
-#             and current_size + len(json.dumps(query_histories[0])) <= max_blob_size
-#         ):
-#             item = query_histories.pop(0)
-#             chunk.append(item)
-#             current_size += len(json.dumps(item))
-
-#         chunk_blob_name = f"{blob_client.blob_name}_chunk_{chunk_index}"
-#         chunk_blob_client = blob_client.get_blob_client(chunk_blob_name)
-#         chunk_blob_client.upload_blob(json.dumps(chunk), overwrite=True)
-#         chunk_index += 1
+#     container_client = get_blob_container_client(blob_client.container_name)
+#     encoded = [_dumps(item) for item in query_histories]
+
+#     chunks = []
+#     i = 0
+#     while i < len(encoded):
+#         buf = bytearray(b"[")
+#         buf += encoded[i]
+#         i += 1
+#         while i < len(encoded) and len(buf) + len(encoded[i]) + 2 <= max_blob_size:
+#             buf += b","
+#             buf += encoded[i]
+#             i += 1
+#         buf += b"]"
+#         chunks.append(bytes(buf))
+
+#     def upload_chunk(chunk_index: int, chunk: bytes):
+#         chunk_blob_client = container_client.get_blob_client(
+#             f"{blob_client.blob_name}_chunk_{chunk_index}"
+#         )
+#         chunk_blob_client.upload_blob(chunk, overwrite=True)
+
+#     # the chunks are independent, so upload a few at a time
+#     with ThreadPoolExecutor(max_workers=8) as executor:
+#         list(executor.map(upload_chunk, range(len(chunks)), chunks))
 
 
 def load_query_histories(blob_name: str) -> list:
@@ -348,13 +595,12 @@ def load_query_histories(blob_name: str) -> list:
     Returns:
         list: The query histories data.
     """
-    blob_service_client = BlobServiceClientSingleton.get_instance()
-    blob_client = blob_service_client.get_blob_client(
-        container="query-history", blob=blob_name
-    )
+    blob_client = _get_query_history_blob_client(blob_name)
 
     try:
-        download_stream = blob_client.download_blob()
+        download_stream = blob_client.download_blob(
+            max_concurrency=BLOB_MAX_CONCURRENCY
+        )
         query_context = json.loads(download_stream.readall())
 
         return query_context
@@ -363,6 +609,13 @@ def load_query_histories(blob_name: str) -> list:
         return []
 
 
+def _query_history_row(name: str, metadata: dict) -> dict:
+    row = {"name": name}
+    for key in QUERY_HISTORY_META_KEYS:
+        row[key] = metadata.get(key)
+    return row
+
+
 def fetch_queryhistories_metadata(container_name: str, prefix: str):
     """
     List blobs with a specific prefix synchronously and retrieve their metadata.
@@ -374,25 +627,9 @@ def fetch_queryhistories_metadata(container_name: str, prefix: str):
     Returns:
         list[dict]: A list of dictionaries where each dictionary contains the blob name and its metadata.
     """
-    blob_service_client = BlobServiceClientSingleton.get_instance()
-    container_client = blob_service_client.get_container_client(container_name)
-    blob_metadata_list = []
+    container_client = get_blob_container_client(container_name)
 
     # List blobs with their metadata in a single API call
     blobs = container_client.list_blobs(name_starts_with=prefix, include=["metadata"])
 
-    for blob in blobs:
-        # Prepare the metadata dictionary
-        metadata_dict = {
-            "name": blob.name,
-            "lastquerytime": blob.metadata.get("lastquerytime"),
-            "lastquerycontent": blob.metadata.get("lastquerycontent"),
-            "lastqueryindexes": blob.metadata.get("lastqueryindexes"),
-            "lastqueryType": blob.metadata.get("lastqueryType"),
-            "lastanswercontent": blob.metadata.get("lastanswercontent"),
-        }
-
-        # Add the metadata dictionary to the list
-        blob_metadata_list.append(metadata_dict)
-
-    return blob_metadata_list
+    return [_query_history_row(blob.name, blob.metadata) for blob in blobs]
@@ -1,48 +1,103 @@
 # Copyright Jonathan AW.
 # Licensed under the MIT License.
 
+import os
+import threading
 import time
+from collections import OrderedDict
 
 import bcrypt
 from src.auth.db import deactivate_user
 
 LOCKOUT_THRESHOLD = 5
 LOCKOUT_TIME = 600  # 10 minutes
+LOGIN_ATTEMPTS_MAXSIZE = 10_000  # oldest entries are evicted beyond this
+DEFAULT_SALT_ROUNDS = 12
+MIN_SALT_ROUNDS = 10  # lowest bcrypt cost accepted outside local testing
+MAX_SALT_ROUNDS = 14  # each step doubles the time of every login
+
+
+def _salt_rounds_from_env() -> int:
+    value = os.getenv("BCRYPT_COST", str(DEFAULT_SALT_ROUNDS))
+    try:
+        rounds = int(value)
+    except ValueError:
+        print(f"BCRYPT_COST={value!r} is not an integer, using {DEFAULT_SALT_ROUNDS}")
+        return DEFAULT_SALT_ROUNDS
+    # a typo such as 4 would quietly weaken every new hash, so a low cost is only
+    # honoured when BCRYPT_ALLOW_LOW_COST=1 is set for local testing
+    if os.getenv("BCRYPT_ALLOW_LOW_COST") == "1":
+        lowest = 4  # the smallest cost bcrypt.gensalt accepts
+    else:
+        lowest = MIN_SALT_ROUNDS
+    clamped = min(max(rounds, lowest), MAX_SALT_ROUNDS)
+    if clamped != rounds:
+        print(
+            f"BCRYPT_COST={rounds} is outside {lowest}-{MAX_SALT_ROUNDS}, using {clamped}"
+        )
+    return clamped
+
+
+# bcrypt cost factor for new hashes, read once when the module is first imported
+SALT_ROUNDS = _salt_rounds_from_env()
 
-login_attempts = {}
+# failed attempts per username; entries expire LOCKOUT_TIME after the first attempt
+login_attempts: OrderedDict[str, dict] = OrderedDict()
+_login_attempts_lock = threading.RLock()
+
+# bcrypt releases the GIL, so logins on different Streamlit script threads already
+# hash in parallel; cap them at the CPU count so a burst of attempts cannot
+# starve every other session of CPU.
+_bcrypt_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
 
 
 def hash_password(password: str, salt: int) -> str:
     # Generate a salt with the appropriate log rounds (cost)
     salt_bytes = bcrypt.gensalt(rounds=salt)
     # Hash the password using the generated salt
-    return bcrypt.hashpw(password.encode(), salt_bytes).decode()
+    with _bcrypt_slots:
+        return bcrypt.hashpw(password.encode(), salt_bytes).decode()
 
 
 def verify_password(stored_password: str, provided_password: str) -> bool:
-    return bcrypt.checkpw(provided_password.encode(), stored_password.encode())
+    with _bcrypt_slots:
+        return bcrypt.checkpw(provided_password.encode(), stored_password.encode())
+
+
+def _purge_expired_attempts(now: float) -> None:
+    # entries are kept in insertion order, i.e. ordered by last_attempt_time
+    while login_attempts:
+        attempts = next(iter(login_attempts.values()))
+        if now - attempts["last_attempt_time"] < LOCKOUT_TIME:
+            break
+        login_attempts.popitem(last=False)
 
 
-def record_failed_attempt(username: str):
+def record_failed_attempt(username: str) -> int:
     """
     Records a failed login attempt for the given username.
     Parameters:
     - username (str): The username for which the login attempt failed.
     Returns:
-    - None
+    - int: The number of failed attempts recorded for the username, this one included.
     Raises:
     - None
     """
-    if username in login_attempts:
-        login_attempts[username]["count"] += 1
-    else:
-        login_attempts[username] = {"count": 1, "last_attempt_time": time.time()}
-
-    if (
-        login_attempts[username]["count"] >= LOCKOUT_THRESHOLD
-        and time.time() - login_attempts[username]["last_attempt_time"] < LOCKOUT_TIME
-    ):
+    now = time.time()
+    with _login_attempts_lock:
+        _purge_expired_attempts(now)
+        attempts = login_attempts.get(username)
+        if attempts is None:
+            attempts = {"count": 0, "last_attempt_time": now}
+            login_attempts[username] = attempts
+            if len(login_attempts) > LOGIN_ATTEMPTS_MAXSIZE:
+                login_attempts.popitem(last=False)
+        attempts["count"] += 1
+        count = attempts["count"]
+
+    if count >= LOCKOUT_THRESHOLD:
         deactivate_user(username)  # Lock the account if exceeded threshold
+    return count
 
 
 def is_account_locked(username: str) -> bool:
@@ -53,22 +108,12 @@ def is_account_locked(username: str) -> bool:
     Returns:
         bool: True if the account is locked, False otherwise.
     """
-    if username not in login_attempts:
-        return False
-
-    attempts = login_attempts[username]
-    if (
-        attempts["count"] >= LOCKOUT_THRESHOLD
-        and time.time() - attempts["last_attempt_time"] < LOCKOUT_TIME
-    ):
-        return True
-    elif time.time() - attempts["last_attempt_time"] > LOCKOUT_TIME:
-        login_attempts[username]["count"] = 0
-        return False
-
-    return False
+    with _login_attempts_lock:
+        _purge_expired_attempts(time.time())
+        attempts = login_attempts.get(username)
+        return attempts is not None and attempts["count"] >= LOCKOUT_THRESHOLD
 
 
 def reset_failed_attempts(username: str):
-    if username in login_attempts:
-        login_attempts[username]["count"] = 0
+    with _login_attempts_lock:
+        login_attempts.pop(username, None)
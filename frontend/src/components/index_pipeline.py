@@ -13,7 +13,6 @@ from src.functions import GraphragAPI
 class IndexPipeline:
     def __init__(self, client: GraphragAPI, column_widths: list[float]) -> None:
         self.client = client
-        self.containers = client.get_storage_container_names()
         self.column_widths = column_widths
 
     def storage_data_step(self):
@@ -22,6 +21,7 @@ class IndexPipeline:
         """
 
         disable_other_input = False
+        containers = self.client.get_storage_container_names()
         _, col2, _ = st.columns(self.column_widths)
 
         with col2:
@@ -32,9 +32,7 @@ class IndexPipeline:
             )
             select_storage_name = st.selectbox(
                 label="Select an existing Storage Container.",
-                options=[""] + self.containers
-                if isinstance(self.containers, list)
-                else [],
+                options=[""] + containers if isinstance(containers, list) else [],
                 key="index-storage",
                 index=0,
             )
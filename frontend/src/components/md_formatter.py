@@ -1,4 +1,5 @@
 import ast
+from functools import lru_cache
 
 import streamlit as st
 
@@ -15,6 +16,11 @@ def display_markdown_text(text: str):
     Returns:
     None
     """
+    # Only a list literal can hold dictionaries; skip building an AST for plain text
+    if not text.lstrip().startswith("["):
+        st.markdown(escape_special_chars(text))
+        return
+
     try:
         # Attempt to parse the string using ast.literal_eval()
         parsed = ast.literal_eval(text)
@@ -29,72 +35,40 @@ def display_markdown_text(text: str):
         st.markdown(escape_special_chars(text))
 
 
-def display_pythonListDict_as_markdown(listDict):
-    for item in listDict:
-        # Process common fields that might exist in all dictionary types
-        if "title" in item:
-            st.markdown(f"### {escape_special_chars(item['title'])}")
-
-        if "entity" in item:
-            st.markdown(f"**Entity:** {item['entity']}")
-
-        if "rank" in item:
-            st.markdown(f"**Rank:** {item['rank']}")
-
-        if "in_context" in item:
-            st.markdown(f"**In Context:** {item['in_context']}")
-
-        if "id" in item:
-            st.markdown(f"**ID:** {item['id']}")
-
-        if "index_id" in item:
-            st.markdown(f"**Index ID:** {item['index_id']}")
+# Fields rendered for each entry, in display order, with their markdown
+# template and whether the value needs special characters escaped
+_FIELDS = (
+    ("title", "### {}", True),
+    ("entity", "**Entity:** {}", False),
+    ("rank", "**Rank:** {}", False),
+    ("in_context", "**In Context:** {}", False),
+    ("id", "**ID:** {}", False),
+    ("index_id", "**Index ID:** {}", False),
+    ("index_name", "**Index Name:** {}", False),
+    ("number of relationships", "**Number of Relationships:** {}", False),
+    ("source", "**Source:** {}", False),
+    ("target", "**Target:** {}", False),
+    ("weight", "**Weight:** {}", False),
+    ("links", "**Links:** {}", False),
+    ("content", "{}", True),
+    ("description", "{}", True),
+)
 
-        if "index_name" in item:
-            st.markdown(f"**Index Name:** {item['index_name']}")
 
-        if "number of relationships" in item:
+def display_pythonListDict_as_markdown(listDict):
+    for item in listDict:
+        displayed = False
+        for key, template, escape in _FIELDS:
+            if key not in item:
+                continue
+            value = item[key]
             st.markdown(
-                f"**Number of Relationships:** {item['number of relationships']}"
+                template.format(escape_special_chars(value) if escape else value)
             )
-
-        if "source" in item:
-            st.markdown(f"**Source:** {item['source']}")
-
-        if "target" in item:
-            st.markdown(f"**Target:** {item['target']}")
-
-        if "weight" in item:
-            st.markdown(f"**Weight:** {item['weight']}")
-
-        if "links" in item:
-            st.markdown(f"**Links:** {item['links']}")
-
-        if "content" in item:
-            st.markdown(escape_special_chars(item["content"]))
-
-        if "description" in item:
-            st.markdown(escape_special_chars(item["description"]))
+            displayed = True
 
         # Add a horizontal line to separate different entries, only if any field was displayed
-        if any(
-            key in item
-            for key in [
-                "title",
-                "content",
-                "description",
-                "rank",
-                "id",
-                "index_id",
-                "index_name",
-                "entity",
-                "number of relationships",
-                "source",
-                "target",
-                "weight",
-                "links",
-            ]
-        ):
+        if displayed:
             st.markdown("---")
 
 
@@ -112,7 +86,9 @@ def escape_special_chars(text: str, chars_to_escape=["$"]) -> str:
     if chars_to_escape is None:
         chars_to_escape = ["$"]
 
-    for char in chars_to_escape:
-        text = text.replace(char, f"\\{char}")
+    return text.translate(_escape_table(tuple(chars_to_escape)))
+
 
-    return text
+@lru_cache(maxsize=8)
+def _escape_table(chars_to_escape: tuple) -> dict:
+    return str.maketrans({char: f"\\{char}" for char in chars_to_escape})
@@ -1,10 +1,20 @@
 import streamlit as st
 
+# widget key -> key of the mirrored value that outlives the widget
+_MIRROR: dict[str, str] = {}
+
+
+def _mirror_key(key: str) -> str:
+    mirror = _MIRROR.get(key)
+    if mirror is None:
+        mirror = _MIRROR[key] = "_" + key
+    return mirror
+
 
 def store_value(key):
-    st.session_state[key] = st.session_state["_" + key]
+    st.session_state[key] = st.session_state[_mirror_key(key)]
 
 
 def load_value(key):
     if key in st.session_state:
-        st.session_state["_" + key] = st.session_state[key]
+        st.session_state[_mirror_key(key)] = st.session_state[key]
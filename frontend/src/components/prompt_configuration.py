@@ -9,6 +9,7 @@ from src.enums import PromptFileNames, PromptKeys, PromptTextAreas
 from src.functions import zip_directory
 
 SAVED_PROMPT_VAR = "saved_prompts"
+SAVED_PROMPT_ZIP_MTIME_VAR = "saved_prompts_zip_mtime"
 
 
 def save_prompts(
@@ -33,6 +34,7 @@ def save_prompts(
         with open(outpath, "w", encoding="utf-8") as f:
             f.write(st.session_state[key.value])
     zip_directory(local_dir, zip_file_path)
+    st.session_state[SAVED_PROMPT_ZIP_MTIME_VAR] = os.path.getmtime(zip_file_path)
 
 
 def edit_prompts():
@@ -1,16 +1,23 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
-import os
-from time import sleep
+import hashlib
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
+import requests
 import streamlit as st
 
-from src.auth.db import fetch_queryhistories_metadata, load_query_histories
+from src.auth.db import (
+    QUERY_HISTORY_META_KEYS,
+    fetch_queryhistories_metadata,
+    load_query_histories,
+)
 from src.components.index_pipeline import IndexPipeline
 from src.components.login_sidebar import login
 from src.components.md_formatter import display_markdown_text
 from src.components.prompt_configuration import (
+    SAVED_PROMPT_ZIP_MTIME_VAR,
     edit_prompts,
     prompt_editor,
     save_prompts,
@@ -21,6 +28,208 @@ from src.enums import PromptKeys
 from src.functions import generate_and_extract_prompts
 from src.graphrag_api import GraphragAPI
 
+# Seconds a query history listing or downloaded session is served from the cache
+HISTORY_CACHE_TTL = 60
+
+# Rows sent to the browser per page of a query history table
+HISTORY_PAGE_SIZE = 50
+
+# Seconds the storage container and index names from the API are reused
+API_LIST_CACHE_TTL = 30
+
+# Threads used to send independent API requests at the same time
+_POOL = ThreadPoolExecutor(max_workers=4)
+
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def _cached_queryhistories_metadata(prefix: str) -> list:
+    # keyed on the per-user prefix, so cached listings never cross users
+    return fetch_queryhistories_metadata("query-history", prefix)
+
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, max_entries=256, show_spinner=False)
+def _cached_query_histories(blob_name: str, lastquerytime: str | None) -> list:
+    # lastquerytime changes on every save, so a session that gained queries is
+    # downloaded again instead of being served from the cache
+    return load_query_histories(blob_name)
+
+
+class _UncachedResult(Exception):
+    """
+    Carries API error results out of a cached function, so they are not cached.
+    """
+
+    def __init__(self, result) -> None:
+        super().__init__(result)
+        self.result = result
+
+
+def _checked_names(names):
+    # the API helpers return a Response, an Exception or None on failure
+    if not isinstance(names, list):
+        raise _UncachedResult(names)
+    return names
+
+
+# api_url and key_digest identify the deployment and subscription the client talks
+# to, so sessions only share lists fetched with the same credentials. Each list is
+# cached on its own, so one failing endpoint does not keep the other uncached.
+@st.cache_data(ttl=API_LIST_CACHE_TTL, show_spinner=False)
+def _cached_storage_container_names(
+    api_url: str, key_digest: str, _client: GraphragAPI
+) -> list[str]:
+    return _checked_names(_client.get_storage_container_names())
+
+
+@st.cache_data(ttl=API_LIST_CACHE_TTL, show_spinner=False)
+def _cached_index_names(
+    api_url: str, key_digest: str, _client: GraphragAPI
+) -> list[str]:
+    return _checked_names(_client.get_index_names())
+
+
+_API_LISTS = {
+    "containers": _cached_storage_container_names,
+    "indexes": _cached_index_names,
+}
+
+
+def _client_key(client: GraphragAPI) -> tuple[str, str]:
+    key_digest = hashlib.sha256((client.apim_key or "").encode()).hexdigest()
+    return client.api_url, key_digest
+
+
+def prefetch_api_lists(client: GraphragAPI, containers: bool, indexes: bool) -> None:
+    """
+    Starts loading the storage container names and/or the index names in the
+    background, so the lists needed by the visible tabs are requested together
+    and each tab only waits for its own.
+    """
+    wanted = {"containers": containers, "indexes": indexes}
+    st.session_state["api_list_futures"] = {
+        name: _POOL.submit(loader, *_client_key(client), client)
+        for name, loader in _API_LISTS.items()
+        if wanted[name]
+    }
+
+
+def _api_list(client: GraphragAPI, name: str):
+    """
+    Returns the named API list, reusing it for API_LIST_CACHE_TTL seconds. Errors
+    are returned as the API client returns them and are not cached.
+    """
+    future = st.session_state.get("api_list_futures", {}).pop(name, None)
+    try:
+        if future is not None:
+            return future.result()
+        return _API_LISTS[name](*_client_key(client), client)
+    except _UncachedResult as e:
+        return e.result
+
+
+# Columns of the query history listing (see fetch_queryhistories_metadata)
+_HISTORY_COLUMNS = ("name",) + QUERY_HISTORY_META_KEYS
+_HISTORY_COLUMNS = (
+    "name",
+    "lastquerytime",
+    "lastquerycontent",
+    "lastqueryindexes",
+    "lastqueryType",
+    "lastanswercontent",
+)
+
+
+def _session_frame(
+    records: list, key: str, columns: tuple | None = None
+) -> pd.DataFrame:
+    """
+    Returns records as a DataFrame kept in st.session_state under key.
+
+    The frame is only rebuilt when the list has been replaced or has grown, so
+    reruns that do not touch the records reuse it instead of converting again.
+    Records with a fixed set of keys should pass them as columns, which spares
+    pandas from collecting the keys of every record.
+    """
+    cached = st.session_state.get(key)
+    if cached is None or cached[0] is not records or cached[1] != len(records):
+        df = pd.DataFrame.from_records(records, columns=columns)
+        cached = (records, len(records), df)
+        st.session_state[key] = cached
+    return cached[2]
+
+
+def _selected_history_frame(blob_name: str, lastquerytime: str | None) -> pd.DataFrame:
+    """
+    Returns the completed queries of a past session as a DataFrame.
+
+    The frame of the selected session is kept in st.session_state, so clicking
+    rows of the inner table neither fetches the session from the cache again
+    nor rebuilds the frame; a new selection or a newer save replaces it.
+    """
+    version = (blob_name, lastquerytime)
+    cached = st.session_state.get("_selected_history_frame")
+    if cached is None or cached[0] != version:
+        session_data = _cached_query_histories(blob_name, lastquerytime)
+        cached = (version, pd.DataFrame(session_data))
+        st.session_state["_selected_history_frame"] = cached
+    return cached[1]
+
+
+def _paginate(
+    df: pd.DataFrame, key: str, page_size: int = HISTORY_PAGE_SIZE
+) -> tuple[pd.DataFrame, int]:
+    """
+    Returns the page of df picked with a page number input, and its first row.
+
+    Tables that fit on one page are returned whole without the input. Row
+    selections made on the page are relative to it, so look them up in the
+    returned frame.
+    """
+    if len(df) <= page_size:
+        return df, 0
+    num_pages = (len(df) - 1) // page_size + 1
+    page = st.number_input(
+        f"Page (1-{num_pages})",
+        min_value=1,
+        max_value=num_pages,
+        value=1,
+        step=1,
+        key=key,
+    )
+    start = (page - 1) * page_size
+    return df.iloc[start : start + page_size], start
+
+
+# Detail fields of a completed query, in display order, with their labels
+_DETAIL_FIELDS = (
+    ("content", "Content"),
+    ("context", "Context"),
+    ("reports", "Reports"),
+    ("entities", "Entities"),
+    ("relationship", "Relationship"),
+)
+
+
+def _is_null(value) -> bool:
+    # missing cells come back from a DataFrame row as None or NaN
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _render_row_detail(row: dict) -> None:
+    """
+    Displays the detail fields present in a selected query row as tabs, in
+    _DETAIL_FIELDS order so Content, when present, is the one shown first.
+    """
+    present = [
+        (label, row[key]) for key, label in _DETAIL_FIELDS if not _is_null(row.get(key))
+    ]
+    if not present:
+        return
+    detail_tabs = st.tabs([f":blue[**{label}**]" for label, _ in present])
+    for detail_tab, (_, value) in zip(detail_tabs, present):
+        with detail_tab:
+            display_markdown_text(value)
+
 
 def get_query_history_tab() -> None:
     """
@@ -35,8 +244,8 @@ def get_query_history_tab() -> None:
         # Load the chat histories for the current user
 
         try:
-            list_queryhistories_metadata = fetch_queryhistories_metadata(
-                "query-history", st.session_state.session_id_prefix
+            list_queryhistories_metadata = _cached_queryhistories_metadata(
+                st.session_state.session_id_prefix
             )
 
             if not list_queryhistories_metadata:
@@ -53,13 +262,17 @@ def get_query_history_tab() -> None:
         st.write("No session histories available.")
         return
 
-    df_histories = pd.DataFrame(st.session_state.query_histories)
+    df_histories = _session_frame(
+        st.session_state.query_histories, "_query_histories_frame", _HISTORY_COLUMNS
+    )
     st.markdown(
         "__Click on first column of the row (each representing a past session) to view all the completed queries of that session.__"
     )
+    df_histories, start = _paginate(df_histories, key="query_histories_page")
     event_select_query_histories = st.dataframe(
         df_histories,
-        key="select_query_histories",
+        # a new key per page so a selection does not carry over to another page
+        key=f"select_query_histories_{start}",
         selection_mode="single-row",
         on_select="rerun",
         column_config={
@@ -91,12 +304,14 @@ def get_query_history_tab() -> None:
 
         selectedName = selectedHistory["name"]
         with st.expander(":blue[**Completed Queries**]", expanded=True):
-            session_data = load_query_histories(selectedName)
-            df = pd.DataFrame(session_data)
+            df = _selected_history_frame(
+                selectedName, selectedHistory.get("lastquerytime")
+            )
             st.markdown("__Click on first column of the row to view the details.__")
+            df, start = _paginate(df, key=f"query_history_rows_page_{selectedName}")
             event_select_query_history_row = st.dataframe(
                 df,
-                key="selected_query_history_row",
+                key=f"selected_query_history_row_{start}",
                 selection_mode="single-row",
                 on_select="rerun",
             )
@@ -105,29 +320,32 @@ def get_query_history_tab() -> None:
             selectedRow = df.iloc[
                 event_select_query_history_row.selection.rows[0]
             ].to_dict()
-            if "content" in selectedRow.keys() and not pd.isna(selectedRow["content"]):
-                with st.expander(":blue[**Content**]", expanded=True):
-                    display_markdown_text(selectedRow["content"])
-
-            if "context" in selectedRow.keys() and not pd.isna(selectedRow["context"]):
-                with st.expander(":blue[**Context**]"):
-                    display_markdown_text(selectedRow["context"])
-
-            if "reports" in selectedRow.keys() and not pd.isna(selectedRow["reports"]):
-                with st.expander(":blue[**Reports**]"):
-                    display_markdown_text(selectedRow["reports"])
-
-            if "entities" in selectedRow.keys() and not pd.isna(
-                selectedRow["entities"]
-            ):
-                with st.expander(":blue[**Entities**]"):
-                    display_markdown_text(selectedRow["entities"])
-
-            if "relationship" in selectedRow.keys() and not pd.isna(
-                selectedRow["relationship"]
-            ):
-                with st.expander(":blue[**Relationship**]"):
-                    display_markdown_text(selectedRow["relationship"])
+            _render_row_detail(selectedRow)
+
+
+# Intro text of the main tab
+_MAIN_TAB_CONTENT = """
+Diving into complex information and uncovering semantic relationships utilizing generative AI has never been easier.
+Here's how you can get started with just a few clicks:
+- **PROMPT GENERATION:** (*Optional Step*)
+    1. Generate fine-tuned prompts for graphrag customized to your data and domain.
+    2. Select an existing Storage Container and click "Generate Prompts".
+- **PROMPT CONFIGURATION:** (*Optional Step*)
+    1. Edit the generated prompts to best suit your needs.
+    2. Once you are finished editing, click the "Save Prompts" button.
+    3. Saving the prompts will store them for use in the follow-on Indexing step.
+    4. You can also download the edited prompts for future reference.
+- **INDEXING:**
+    1. Select an existing data storage container or upload data, to Index
+    2. Name your index and select "Build Index" to begin building a GraphRAG Index.
+    3. Check the status of the index as the job progresses.
+- **QUERYING:**
+    1. Choose an existing index
+    2. Specify a query type
+    3. Click "Query" button to search and view insights.
+
+[GraphRAG](https://www.microsoft.com/en-us/research/blog/graphrag-unlocking-llm-discovery-on-narrative-private-data/) combines the power of RAG with a Graph structure, giving you insights at your fingertips.
+"""
 
 
 def get_main_tab(initialized: bool) -> None:
@@ -135,35 +353,23 @@ def get_main_tab(initialized: bool) -> None:
     Displays content of Main Tab
     """
 
-    url = "https://www.microsoft.com/en-us/research/blog/graphrag-unlocking-llm-discovery-on-narrative-private-data/"
-    content = f"""
-    Diving into complex information and uncovering semantic relationships utilizing generative AI has never been easier.
-    Here's how you can get started with just a few clicks:
-    - **PROMPT GENERATION:** (*Optional Step*)
-        1. Generate fine-tuned prompts for graphrag customized to your data and domain.
-        2. Select an existing Storage Container and click "Generate Prompts".
-    - **PROMPT CONFIGURATION:** (*Optional Step*)
-        1. Edit the generated prompts to best suit your needs.
-        2. Once you are finished editing, click the "Save Prompts" button.
-        3. Saving the prompts will store them for use in the follow-on Indexing step.
-        4. You can also download the edited prompts for future reference.
-    - **INDEXING:**
-        1. Select an existing data storage container or upload data, to Index
-        2. Name your index and select "Build Index" to begin building a GraphRAG Index.
-        3. Check the status of the index as the job progresses.
-    - **QUERYING:**
-        1. Choose an existing index
-        2. Specify a query type
-        3. Click "Query" button to search and view insights.
-
-    [GraphRAG]({url}) combines the power of RAG with a Graph structure, giving you insights at your fingertips.
-    """
     # Display text in the gray box
-    st.markdown(content, unsafe_allow_html=False)
+    st.markdown(_MAIN_TAB_CONTENT, unsafe_allow_html=False)
     if not initialized:
         login()
 
 
+def _smaller_limit_may_help(error: Exception) -> bool:
+    # the prompt endpoint answers 500 when the sample is too large for the data;
+    # any other failure (unreachable API, auth, a bad zip) would only repeat with
+    # a smaller sample, and each attempt is a slow LLM call
+    return (
+        isinstance(error, requests.HTTPError)
+        and error.response is not None
+        and error.response.status_code == 500
+    )
+
+
 def get_prompt_generation_tab(
     client: GraphragAPI,
     column_widths: list[float],
@@ -185,17 +391,18 @@ def get_prompt_generation_tab(
         st.write(
             "Select a storage container that contains your data. GraphRAG will use this data to generate domain-specific prompts for follow-on indexing."
         )
-        storage_containers = client.get_storage_container_names()
+        storage_containers = _api_list(client, "containers")
 
         # if no storage containers, allow user to upload files
-        if isinstance(storage_containers, list) and not (any(storage_containers)):
+        if isinstance(storage_containers, list) and not storage_containers:
             st.warning(
                 "No existing Storage Containers found. Please upload data to continue."
             )
             uploaded = upload_files(client, key_prefix="prompts-upload-1")
             if uploaded:
-                # brief pause to allow success message to display
-                sleep(1.5)
+                _cached_storage_container_names.clear()
+                # a toast outlives the rerun, so no pause is needed to show it
+                st.toast("Files uploaded successfully!", icon="✅")
                 st.rerun()
         else:
             select_prompt_storage = st.selectbox(
@@ -214,9 +421,10 @@ def get_prompt_generation_tab(
                     disable_other_input=disable_other_input,
                 )
                 if new_upload:
-                    # brief pause to allow success message to display
+                    _cached_storage_container_names.clear()
                     st.session_state["new_upload"] = True
-                    sleep(1.5)
+                    # a toast outlives the rerun, so no pause is needed to show it
+                    st.toast("Files uploaded successfully!", icon="✅")
                     st.rerun()
             if st.session_state["new_upload"] and not select_prompt_storage:
                 st.warning(
@@ -241,12 +449,14 @@ def get_prompt_generation_tab(
                         st.success(
                             "Prompts generated successfully! Move on to the next tab to configure the prompts."
                         )
+                    elif not _smaller_limit_may_help(generated):
+                        st.error(f"Error generating prompts: {generated}")
                     else:
                         # assume limit parameter is too high
                         st.warning(
                             "You do not have enough data to generate prompts. Retrying with a smaller sample size."
                         )
-                        while num_chunks > 1:
+                        while num_chunks > 1 and _smaller_limit_may_help(generated):
                             num_chunks -= 1
                             generated = generate_and_extract_prompts(
                                 client=client,
@@ -260,6 +470,17 @@ def get_prompt_generation_tab(
                                 break
                             else:
                                 st.warning(f"Retrying with sample size: {num_chunks}")
+                        # the retries ran out or hit an error a smaller sample
+                        # cannot fix
+                        if isinstance(generated, Exception):
+                            st.error(f"Error generating prompts: {generated}")
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _read_prompts_zip(path: str, mtime: float) -> bytes:
+    # keyed on the modification time, so a re-saved zip is read again
+    with open(path, "rb") as fp:
+        return fp.read()
 
 
 def get_prompt_configuration_tab(
@@ -273,10 +494,9 @@ def get_prompt_configuration_tab(
         divider=True,
         help="Generate fine tuned prompts for the LLM specific to your data and domain.",
     )
-    prompt_values = [st.session_state[k.value] for k in PromptKeys]
-
-    if any(prompt_values):
-        prompt_editor([prompt_values[0], prompt_values[1], prompt_values[2]])
+    # stops at the first prompt found instead of collecting all of them first
+    if any(st.session_state[k.value] for k in PromptKeys):
+        prompt_editor([st.session_state[k.value] for k in PromptKeys])
         col1, col2, col3 = st.columns(3, gap="large")
         with col1:
             clicked = st.button(
@@ -296,18 +516,19 @@ def get_prompt_configuration_tab(
                 on_click=edit_prompts,
             )
         with col3:
-            if os.path.exists(download_file_name):
-                with open(download_file_name, "rb") as fp:
-                    st.download_button(
-                        "Download Prompts",
-                        data=fp,
-                        file_name=download_file_name,
-                        help="Downloads the saved prompts as a zip file containing three LLM prompts in .txt format.",
-                        mime="application/zip",
-                        type="primary",
-                        disabled=not st.session_state["saved_prompts"],
-                        key="download-prompt-button",
-                    )
+            # set by save_prompts, so there is no need to stat the file each rerun
+            zip_mtime = st.session_state.get(SAVED_PROMPT_ZIP_MTIME_VAR)
+            if zip_mtime is not None:
+                st.download_button(
+                    "Download Prompts",
+                    data=_read_prompts_zip(download_file_name, zip_mtime),
+                    file_name=download_file_name,
+                    help="Downloads the saved prompts as a zip file containing three LLM prompts in .txt format.",
+                    mime="application/zip",
+                    type="primary",
+                    disabled=not st.session_state["saved_prompts"],
+                    key="download-prompt-button",
+                )
         if clicked:
             st.success(
                 "Prompts saved successfully! Downloading prompts is now enabled."
@@ -323,6 +544,20 @@ def get_index_tab(indexPipe: IndexPipeline) -> None:
     indexPipe.check_status_step()
 
 
+# Prompt sent by "Give me some ideas on what to ask". GraphQuery recognizes it by
+# its first line, so keep that line unchanged.
+_SUGGEST_QUERY_TEMPLATE = textwrap.dedent(
+    """\
+    Suggest 10 relevant questions about your knowledgebase.
+    Instructions:
+    - Recap the strengths of GraphRAG {search_mode} Search, particularly how it addresses the limitations of baseline RAG models.
+    - Do not provide an explanation of GraphRAG itself
+    - Ensure that the questions are varied and relevant
+    - Focus on generating a list of sample questions that are relevant to your knowledgebase that cannot be served by `baseline rag` but are suitable for `GraphRAG {search_mode} Search`.
+    """
+)
+
+
 def execute_query(
     query_engine: GraphQuery, query_type: str, search_index: str | list[str], query: str
 ) -> None:
@@ -337,14 +572,31 @@ def execute_query(
         return st.warning("Please enter a query to search.")
 
 
-def get_query_tab(client: GraphragAPI, allowed_index) -> None:
+def _graph_query(client: GraphragAPI) -> GraphQuery:
     """
-    Displays content of Query Tab
+    Returns the session's GraphQuery, creating it when the client or the
+    session id changes. Like the API client, it is kept in st.session_state
+    rather than st.cache_resource because it is per-session state.
     """
-    with st.form("query-form"):
+    gquery = st.session_state.get("graph_query")
+    if (
+        gquery is None
+        or gquery.client is not client
+        or gquery.session_id != st.session_state.session_id
+    ):
         gquery = GraphQuery(
             client, st.session_state.session_id, st.session_state.username
         )
+        st.session_state["graph_query"] = gquery
+    return gquery
+
+
+def get_query_tab(client: GraphragAPI, allowed_index) -> None:
+    """
+    Displays content of Query Tab
+    """
+    with st.form("query-form"):
+        gquery = _graph_query(client)
         col1, col2 = st.columns(2)
         with col1:
             query_type = st.selectbox(
@@ -354,18 +606,17 @@ def get_query_tab(client: GraphragAPI, allowed_index) -> None:
                 help="Select the query type - Each yields different results of specificity. Global streaming is a global query that displays results as they appear live. Global queries focus on aggregating information across the entire dataset, making them ideal for answering broader, more complex questions that require an understanding of larger patterns or themes in the data. Local queries focus on retrieving specific information based on close relationships within the knowledge graph, suitable for narrow, well-defined questions.",
             )
         with col2:
-            search_indexes = client.get_index_names()
-            if not any(search_indexes):
+            search_indexes = _api_list(client, "indexes")
+            if not search_indexes:
                 st.warning("No indexes found. Please build an index to continue.")
 
             # filter indexes to only those that are complete and allowed
-            filtered_indexes = [
-                index for index in search_indexes if index in allowed_index
-            ]
+            allowed = frozenset(allowed_index)
+            filtered_indexes = [index for index in search_indexes if index in allowed]
 
             select_index_search = st.multiselect(
                 label="Index",
-                options=filtered_indexes if any(filtered_indexes) else [],
+                options=filtered_indexes,
                 key="multiselect-index-search",
                 help="Select the index(es) to query. The selected index(es) must have a complete status in order to yield query results without error. Use Check Index Status to confirm status.",
             )
@@ -386,17 +637,10 @@ def get_query_tab(client: GraphragAPI, allowed_index) -> None:
         # defining a query variable enables the use of either the search bar or the search button to trigger the query
         query = st.session_state["search-query"]
 
-        if suggest_query and any(select_index_search):
+        if suggest_query and select_index_search:
             # 'Suggest Query' Mode
             search_mode = "Local" if query_type == "Local" else "Global"
-            prompt = f"""
-                    Suggest 10 relevant questions about your knowledgebase.
-                    Instructions:
-                    - Recap the strengths of GraphRAG {search_mode} Search, particularly how it addresses the limitations of baseline RAG models.
-                    - Do not provide an explanation of GraphRAG itself
-                    - Ensure that the questions are varied and relevant
-                    - Focus on generating a list of sample questions that are relevant to your knowledgebase that cannot be served by `baseline rag` but are suitable for `GraphRAG {search_mode} Search`.
-                    """
+            prompt = _SUGGEST_QUERY_TEMPLATE.format(search_mode=search_mode)
             execute_query(
                 query_engine=gquery,
                 query_type=query_type,
@@ -404,7 +648,7 @@ def get_query_tab(client: GraphragAPI, allowed_index) -> None:
                 query=prompt,
             )
         elif len(query) > 5:
-            if (search_bar and search_button) and any(select_index_search):
+            if (search_bar and search_button) and select_index_search:
                 st.session_state["query-context"] = f"User: {query}"
 
                 st.write(f"You asked: \n**{query}**")
@@ -419,7 +663,7 @@ def get_query_tab(client: GraphragAPI, allowed_index) -> None:
         else:
             col1, col2 = st.columns([0.3, 0.7])
             with col1:
-                if not any(select_index_search):
+                if not select_index_search:
                     st.warning("Please select an index!")
                 else:
                     st.warning(
@@ -431,7 +675,9 @@ def get_query_tab(client: GraphragAPI, allowed_index) -> None:
         and len(st.session_state["query_context"]) > 0
     ):
         with gquery._create_section_expander("Completed Queries:", expanded=True):
-            df = pd.DataFrame(st.session_state["query_context"])
+            df = _session_frame(
+                st.session_state["query_context"], "_query_context_frame"
+            )
             st.markdown("__Click on first column of the row to view the details.__")
             event_select_query_row = st.dataframe(
                 df,
@@ -442,26 +688,4 @@ def get_query_tab(client: GraphragAPI, allowed_index) -> None:
 
         if len(event_select_query_row.selection.rows) > 0:
             selectedRow = df.iloc[event_select_query_row.selection.rows[0]].to_dict()
-            if "content" in selectedRow.keys() and not pd.isna(selectedRow["content"]):
-                with st.expander(":blue[**Content**]", expanded=True):
-                    display_markdown_text(selectedRow["content"])
-
-            if "context" in selectedRow.keys() and not pd.isna(selectedRow["context"]):
-                with st.expander(":blue[**Context**]"):
-                    display_markdown_text(selectedRow["context"])
-
-            if "reports" in selectedRow.keys() and not pd.isna(selectedRow["reports"]):
-                with st.expander(":blue[**Reports**]"):
-                    display_markdown_text(selectedRow["reports"])
-
-            if "entities" in selectedRow.keys() and not pd.isna(
-                selectedRow["entities"]
-            ):
-                with st.expander(":blue[**Entities**]"):
-                    display_markdown_text(selectedRow["entities"])
-
-            if "relationship" in selectedRow.keys() and not pd.isna(
-                selectedRow["relationship"]
-            ):
-                with st.expander(":blue[**Relationship**]"):
-                    display_markdown_text(selectedRow["relationship"])
+            _render_row_detail(selectedRow)
@@ -26,6 +26,8 @@ class GraphragAPI:
             "Content-Type": "application/json",
         }
         self.upload_headers = {"Ocp-Apim-Subscription-Key": self.apim_key}
+        # reuse pooled keep-alive connections across calls
+        self.session = requests.Session()
 
     def get_storage_container_names(
         self, storage_name_key: str = "storage_name"
@@ -34,7 +36,7 @@ class GraphragAPI:
         GET request to GraphRAG API for Azure Blob Storage Container names.
         """
         try:
-            response = requests.get(f"{self.api_url}/data", headers=self.headers)
+            response = self.session.get(f"{self.api_url}/data", headers=self.headers)
             if response.status_code == 200:
                 return response.json()[storage_name_key]
             else:
@@ -49,7 +51,7 @@ class GraphragAPI:
         Upload files to Azure Blob Storage Container.
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url + "/data",
                 headers=self.upload_headers,
                 files=file_payloads,
@@ -67,7 +69,7 @@ class GraphragAPI:
         GET request to GraphRAG API for existing indexes.
         """
         try:
-            response = requests.get(f"{self.api_url}/index", headers=self.headers)
+            response = self.session.get(f"{self.api_url}/index", headers=self.headers)
             if response.status_code == 200:
                 return response.json()[index_name_key]
             else:
@@ -109,7 +111,7 @@ class GraphragAPI:
                 if isinstance(summarize_description_prompt_filepath, str)
                 else summarize_description_prompt_filepath
             )
-        return requests.post(
+        return self.session.post(
             url,
             files=prompt_files if len(prompt_files) > 0 else None,
             params={"index_name": index_name, "storage_name": storage_name},
@@ -122,7 +124,7 @@ class GraphragAPI:
         """
         url = self.api_url + f"/index/status/{index_name}"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url, headers=self.headers)
             if response.status_code == 200:
                 return response
             else:
@@ -137,7 +139,7 @@ class GraphragAPI:
         """
         url = self.api_url + "/health"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url, headers=self.headers)
             return response.status_code
         except Exception as e:
             print(f"Error: {str(e)}")
@@ -153,7 +155,7 @@ class GraphragAPI:
                 "query": query,
                 "reformat_context_data": True,
             }
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/query/{query_type.lower()}",
                 headers=self.headers,
                 json=request,
@@ -176,7 +178,7 @@ class GraphragAPI:
         """
         url = f"{self.api_url}/experimental/query/global/streaming"
         try:
-            query_response = requests.post(
+            query_response = self.session.post(
                 url,
                 json={"index_name": index_name, "query": query},
                 headers=self.headers,
@@ -188,7 +190,7 @@ class GraphragAPI:
 
     def get_source_entity(self, index_name: str, entity_id: str) -> dict | None:
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_url}/source/entity/{index_name}/{entity_id}",
                 headers=self.headers,
             )
@@ -207,7 +209,9 @@ class GraphragAPI:
         """
         url = self.api_url + "/index/config/prompts"
         params = {"storage_name": storage_name, "limit": limit}
-        with requests.get(url, params=params, headers=self.headers, stream=True) as r:
+        with self.session.get(
+            url, params=params, headers=self.headers, stream=True
+        ) as r:
             r.raise_for_status()
             with open(zip_file_name, "wb") as f:
                 for chunk in r.iter_content():
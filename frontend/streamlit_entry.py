@@ -4,22 +4,38 @@ from datetime import datetime
 
 import streamlit as st
 from src.auth.db import (
+    activate_user,
     delete_user,
     get_user,
     list_graphrag_indexes,
     list_users,
     save_user,
+    set_user_access,
+    set_user_password,
 )
 from src.auth.models import User
 from src.auth.security import (
     LOCKOUT_THRESHOLD,
+    SALT_ROUNDS,
     hash_password,
     is_account_locked,
-    login_attempts,
     record_failed_attempt,
     reset_failed_attempts,
     verify_password,
 )
+from src.components.md_formatter import escape_special_chars
+
+_PERMISSIONS = ("Administrator", "AllowCreateIndex", "AllowQuery")
+
+
+def _set_session_user(user: User) -> None:
+    # the details page, the page router and the query tab read these instead of
+    # the database, so they are set at login and again whenever the account of
+    # the signed-in user is saved
+    st.session_state["user"] = user
+    st.session_state["permissions"] = user.permissions
+    st.session_state["perms_set"] = frozenset(user.permissions)
+    st.session_state["graphragindexes"] = user.graphragindexes
 
 
 # Login UI
@@ -44,8 +60,12 @@ def login():
                 #     st.session_state["username"] = "sa"
                 #     st.session_state["permissions"] = "Administrator"
                 #     st.experimental_rerun() # Login Success! Halt and reload webpage with new user session!
+                # the lockout check is in memory, so a locked account costs no read
+                if is_account_locked(username):
+                    st.error("Account locked or invalid credentials")
+                    return
                 user = get_user(username)
-                if not user or is_account_locked(username):
+                if not user:
                     st.error("Account locked or invalid credentials")
                     return
 
@@ -53,8 +73,7 @@ def login():
                     st.success("Login successful")
                     reset_failed_attempts(username)
                     st.session_state["username"] = username
-                    st.session_state["permissions"] = user.permissions
-                    st.session_state["graphragindexes"] = user.graphragindexes
+                    _set_session_user(user)
                     st.session_state["session_id_prefix"] = f"__{username}__session_"
                     st.session_state["session_id"] = (
                         f"{st.session_state.session_id_prefix}{datetime.now().strftime('%Y%m%d%H%M%S')}"
@@ -62,9 +81,9 @@ def login():
 
                     st.rerun()  # Login Success! Halt and reload webpage with new user session!
                 else:
-                    record_failed_attempt(username)
+                    failed_attempts = record_failed_attempt(username)
                     st.error(
-                        f"Invalid credentials. {LOCKOUT_THRESHOLD - login_attempts.get(username, {'count': 0})['count']} attempts left."
+                        f"Invalid credentials. {LOCKOUT_THRESHOLD - failed_attempts} attempts left."
                     )
 
 
@@ -93,6 +112,7 @@ def cb_change_password():
     if verify_password(user.hashpassword, st.session_state.current_password):
         user.hashpassword = hash_password(st.session_state.new_password, user.salt)
         save_user(user)
+        _set_session_user(user)
         st.session_state.current_password = ""
         st.session_state.new_password = ""
         st.session_state.confirm_password = ""
@@ -131,24 +151,34 @@ def show_user_details():
         st.markdown("## User Details")
     with col2:
         st.image("./imgs/ACE_logo.png", width=200)
-    user = get_user(st.session_state.username)
-    user.id = "***"
-    user.hashpassword = "***"
-    user.salt = "***"
-    # st.write(f"Username: {user.username}")
-    # st.write(f"**Permissions:** {user.permissions}")
-    st.dataframe(user, hide_index=True, width=800)
-    # st.write(f"**GraphRAG Indexes:** {user.graphragindexes}")
+    # the account as read at login
+    details = st.session_state["user"].model_dump()
+    details.update(id="***", hashpassword="***", salt="***")
+    # one account fits a small markdown table and does not need a dataframe
+    rows = "\n".join(
+        f"| {field} | {_table_cell(value)} |" for field, value in details.items()
+    )
+    st.markdown(f"| Field | Value |\n| --- | --- |\n{rows}")
+
+
+# Characters that end a table cell or start markdown or LaTeX formatting
+_TABLE_CELL_ESCAPES = ("\\", "|", "$", "*", "_", "`")
+
+
+def _table_cell(value) -> str:
+    text = ", ".join(value) if isinstance(value, list) else str(value)
+    # a line break would end the table row
+    return escape_special_chars(" ".join(text.split()), _TABLE_CELL_ESCAPES)
 
 
 def cb_CreateUser():
-    salt_rounds = 12  # Recommended cost factor
     username = st.session_state.create_user_username
-    user = User(
+    # Every field comes from a typed widget or our own hash, so skip validation
+    user = User.model_construct(
         id=username,
         username=username,
-        salt=salt_rounds,
-        hashpassword=hash_password(st.session_state.create_user_password, salt_rounds),
+        salt=SALT_ROUNDS,
+        hashpassword=hash_password(st.session_state.create_user_password, SALT_ROUNDS),
         permissions=st.session_state.create_user_permissions,
         graphragindexes=st.session_state.create_user_graphragindexes,
         accountstatus="Active",
@@ -163,10 +193,12 @@ def cb_CreateUser():
 
 
 def cb_ResetPassword(user):
-    salt_rounds = 12  # You can adjust this to increase/decrease the hashing complexity
-    user.salt = salt_rounds
-    user.hashpassword = hash_password(st.session_state.reset_password, user.salt)
-    save_user(user)
+    # patch only the password fields; the rest of the listed record may be stale
+    set_user_password(
+        user.username,
+        SALT_ROUNDS,
+        hash_password(st.session_state.reset_password, SALT_ROUNDS),
+    )
     st.success(f"Password for {user.username} has been reset successfully")
     st.session_state.reset_password = ""
     st.session_state.confirm_reset_password = ""
@@ -184,154 +216,174 @@ def cb_DeleteUser():
 
 
 def cb_unlock_account(user):
-    user.accountstatus = "Active"
-    save_user(user)
+    activate_user(user.username)
     st.success(f"User {user.username} unlocked successfully")
 
 
-def admin_interface():
-    col1, col2 = st.columns([1, 1], vertical_alignment="bottom")
-    with col1:
-        st.markdown("## Users Administration")
-    with col2:
-        st.image("./imgs/ACE_logo.png", width=200)
-    check_permission("Administrator")  # assert permission
+def _user_from_record(record: dict | None) -> User | None:
+    # list_users returns every User field, so no second read is needed
+    return User(**record) if record else None
 
-    c1, c2 = st.columns([1, 2])
-    with c1:
-        action = st.selectbox(
-            "Select Action",
-            [
-                "Create User",
-                "Edit User",
-                "Unlock Account",
-                "Reset Password",
-                "Delete User",
-            ],
+
+def _users_by_name() -> dict:
+    return {user["username"]: user for user in list_users()}
+
+
+# Each admin action is a fragment: its widgets rerun only the action, not the
+# whole page. The actions read the user and index lists themselves, so a
+# fragment rerun after a change sees the refreshed lists.
+@st.experimental_fragment
+def _create_user_action():
+    graphrag_indexes = list_graphrag_indexes()  # Get available indexes
+    with st.form("create_user_form"):
+        st.text_input("Username", key="create_user_username")
+        st.text_input("Default Password", type="password", key="create_user_password")
+        st.multiselect(
+            "Permissions",
+            list(_PERMISSIONS),
+            key="create_user_permissions",
+        )
+        st.multiselect(
+            "GraphRAG Indexes",
+            graphrag_indexes,
+            key="create_user_graphragindexes",
         )
 
-        users = list_users()
-        user_options = [user["username"] for user in users]
+        if st.form_submit_button("Create User", on_click=cb_CreateUser):
+            # Let Callback handle the rest
+            pass
+
+
+@st.experimental_fragment
+def _edit_user_action():
+    users_by_name = _users_by_name()
+    selected_username = st.selectbox("Select User to Edit", list(users_by_name))
+    user = _user_from_record(users_by_name.get(selected_username))
+
+    if user:
         graphrag_indexes = list_graphrag_indexes()  # Get available indexes
+        with st.form("edit_user_form"):
+            permissions = st.multiselect(
+                "Permissions",
+                list(_PERMISSIONS),
+                default=user.permissions,
+            )
+            selected_indexes = st.multiselect(
+                "GraphRAG Indexes",
+                graphrag_indexes,
+                default=user.graphragindexes,
+            )
 
-        if action == "Create User":
-            with st.form("create_user_form"):
-                st.text_input("Username", key="create_user_username")
-                st.text_input(
-                    "Default Password", type="password", key="create_user_password"
-                )
-                permissions = st.multiselect(
-                    "Permissions",
-                    ["Administrator", "AllowCreateIndex", "AllowQuery"],
-                    key="create_user_permissions",
-                )
-                selected_indexes = st.multiselect(
-                    "GraphRAG Indexes",
-                    graphrag_indexes,
-                    key="create_user_graphragindexes",
-                )
-
-                if st.form_submit_button("Create User", on_click=cb_CreateUser):
-                    # Let Callback handle the rest
-                    pass
+            if st.form_submit_button("Update User"):
+                # patch only the edited fields, so a lockout or password change
+                # made since the list was read is not written back over
+                if not set_user_access(
+                    selected_username, permissions, selected_indexes
+                ):
+                    st.error("User not found")
+                    return
+                if selected_username == st.session_state["username"]:
+                    _set_session_user(get_user(selected_username))
+                st.success(f"User {selected_username} updated successfully")
 
-        elif action == "Edit User":
-            selected_username = st.selectbox("Select User to Edit", user_options)
-            user = get_user(selected_username)
+    else:
+        st.error("User not found")
+
+
+@st.experimental_fragment
+def _unlock_account_action():
+    users_by_name = _users_by_name()
+    selected_username = st.selectbox("Select User to Unlock", list(users_by_name))
+    # the listed status may be stale; read the account before offering to unlock
+    user = get_user(selected_username, fresh=True) if selected_username else None
+
+    if user:
+        st.caption(f"Status: {user.accountstatus}")
+        if user.accountstatus == "Active":
+            st.info("Account is already active!")
+        elif st.button("Unlock Account", on_click=cb_unlock_account, args=[user]):
+            # Let Callback handle the rest
+            pass
+    else:
+        st.error("User not found")
 
-            if user:
-                with st.form("edit_user_form"):
-                    permissions = st.multiselect(
-                        "Permissions",
-                        ["Administrator", "AllowCreateIndex", "AllowQuery"],
-                        default=user.permissions,
-                    )
-                    selected_indexes = st.multiselect(
-                        "GraphRAG Indexes",
-                        graphrag_indexes,
-                        default=user.graphragindexes,
-                    )
 
-                    if st.form_submit_button("Update User"):
-                        user.permissions = permissions
-                        user.graphragindexes = selected_indexes
-                        save_user(user)
-                        st.success(f"User {selected_username} updated successfully")
+@st.experimental_fragment
+def _reset_password_action():
+    users_by_name = _users_by_name()
+    selected_username = st.selectbox(
+        "Select User to Reset Password", list(users_by_name)
+    )
+    user = _user_from_record(users_by_name.get(selected_username))
 
+    if user:
+        with st.form("reset_password_form"):
+            new_password = st.text_input(
+                "New Password", type="password", key="reset_password"
+            )
+            confirm_password = st.text_input(
+                "Confirm New Password",
+                type="password",
+                key="confirm_reset_password",
+            )
+
+            if new_password != confirm_password:
+                st.error("Passwords do not match")
             else:
-                st.error("User not found")
-
-        elif action == "Unlock Account":
-            selected_username = st.selectbox("Select User to Unlock", user_options)
-            user = get_user(selected_username)
-
-            if user:
-                f"Status: {user.accountstatus}"
-                if user.accountstatus == "Active":
-                    st.info("Account is already active!")
-                elif st.button(
-                    "Unlock Account", on_click=cb_unlock_account, args=[user]
+                if st.form_submit_button(
+                    "Reset Password", on_click=cb_ResetPassword, args=[user]
                 ):
                     # Let Callback handle the rest
                     pass
-            else:
-                st.error("User not found")
+    else:
+        st.error("User not found")
 
-        elif action == "Reset Password":
-            selected_username = st.selectbox(
-                "Select User to Reset Password", user_options
-            )
-            user = get_user(selected_username)
 
-            if user:
-                with st.form("reset_password_form"):
-                    new_password = st.text_input(
-                        "New Password", type="password", key="reset_password"
-                    )
-                    confirm_password = st.text_input(
-                        "Confirm New Password",
-                        type="password",
-                        key="confirm_reset_password",
-                    )
+@st.experimental_fragment
+def _delete_user_action():
+    users_by_name = _users_by_name()
+    selected_username = st.selectbox(
+        "Select User to Delete", list(users_by_name), key="delete_user_username"
+    )
+    user = _user_from_record(users_by_name.get(selected_username))
 
-                    if new_password != confirm_password:
-                        st.error("Passwords do not match")
-                    else:
-                        if st.form_submit_button(
-                            "Reset Password", on_click=cb_ResetPassword, args=[user]
-                        ):
-                            # Let Callback handle the rest
-                            pass
-            else:
-                st.error("User not found")
+    if user:
+        # Prevent the administrator from deleting their own account
+        if selected_username == st.session_state["username"]:
+            st.warning("You cannot delete your own account.")
+        else:
+            st.checkbox("Confirm delete user?", key="confirm_delete")
+            if st.button("Delete User", on_click=cb_DeleteUser):
+                # Let Callback handle the rest
+                pass
+    else:
+        st.error("User not found")
 
-        elif action == "Delete User":
-            selected_username = st.selectbox(
-                "Select User to Delete", user_options, key="delete_user_username"
-            )
-            user = get_user(selected_username)
 
-            if user:
-                # Prevent the administrator from deleting their own account
-                if selected_username == st.session_state["username"]:
-                    st.warning("You cannot delete your own account.")
-                else:
-                    st.checkbox("Confirm delete user?", key="confirm_delete")
-                    if st.button("Delete User", on_click=cb_DeleteUser):
-                        # Let Callback handle the rest
-                        pass
-            else:
-                st.error("User not found")
+_ADMIN_ACTIONS = {
+    "Create User": _create_user_action,
+    "Edit User": _edit_user_action,
+    "Unlock Account": _unlock_account_action,
+    "Reset Password": _reset_password_action,
+    "Delete User": _delete_user_action,
+}
 
 
-def check_permission(required_permission):
-    if (
-        "permissions" not in st.session_state
-        or required_permission not in st.session_state["permissions"]
-    ):
+def admin_interface():
+    col1, col2 = st.columns([1, 1], vertical_alignment="bottom")
+    with col1:
+        st.markdown("## Users Administration")
+    with col2:
+        st.image("./imgs/ACE_logo.png", width=200)
+    if "Administrator" not in st.session_state.get("perms_set", ()):
         st.error("You do not have permission to access this section.")
         st.stop()
 
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        action = st.selectbox("Select Action", list(_ADMIN_ACTIONS))
+        _ADMIN_ACTIONS[action]()
+
 
 if __name__ == "__main__":
     st.set_page_config(layout="wide")
@@ -343,26 +395,19 @@ if __name__ == "__main__":
     changePasswordPage = st.Page(change_password, title="Change Password")
     logoutPage = st.Page(logout, title="Logout")
 
-    if "username" not in st.session_state:
+    account_pages = [show_user_detailsPage, changePasswordPage, logoutPage]
+    user_nav = {"Copilot": [mainPage], "Account": account_pages}
+    admin_nav = {
+        "Copilot": [mainPage],
+        "Administrator": [UsersAdminPage],
+        "Account": account_pages,
+    }
+
+    username = st.session_state.get("username")
+    perms = st.session_state.get("perms_set", frozenset())
+    if username is None:
         pg = st.navigation([loginPage])
-    elif (
-        "permissions" in st.session_state
-        and "Administrator" in st.session_state["permissions"]
-    ):
-        # st.write(f"Welcome {st.session_state['username']}")
-        pg = st.navigation(
-            {
-                "Copilot": [mainPage],
-                "Administrator": [UsersAdminPage],
-                "Account": [show_user_detailsPage, changePasswordPage, logoutPage],
-            }
-        )
     else:
         # st.write(f"Welcome {st.session_state['username']}")
-        pg = st.navigation(
-            {
-                "Copilot": [mainPage],
-                "Account": [show_user_detailsPage, changePasswordPage, logoutPage],
-            }
-        )
+        pg = st.navigation(admin_nav if "Administrator" in perms else user_nav)
     pg.run()